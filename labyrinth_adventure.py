@@ -25,8 +25,8 @@ prime_levels: dict[int, int] = {}
 next_level = 1
 
 # Per-room state
-# (p, h) -> {"doors": [...], "opened": [None | int | dict], "nxt": int | None}
-room_state: dict[tuple[int, tuple[int, int, int]], dict] = {}
+# le.room_key(p, h) (room id, or (p, h) past the table) -> {"doors": [...], "opened": [None | int | dict], "nxt": int | None}
+room_state: dict[le.RoomKey, dict] = {}
 
 # Path stack for reverse
 # [{"visit_id": int, "p": int, "h": (a, b, c)}, ...]
@@ -151,16 +151,11 @@ def get_or_create_room(p: int, h: tuple[int, int, int]) -> dict:
     Return state dict for room (p, h):
       { "doors": [...], "opened": [None | int | dict], "nxt": int | None }
     """
-    key = (p, h)
+    key = le.room_key(p, h)
     if key in room_state:
         return room_state[key]
 
-    row, nxt = le.build_row(p)
-    doors = None
-    for rh, ds in row:
-        if rh == h:
-            doors = ds
-            break
+    doors, nxt = le.doors_for(p, h)
 
     if doors is None:
         doors = []
@@ -0,0 +1,178 @@
+# -----------------------------------------
+#  labyrinth_catalog.py
+#  SQLite room catalog for Prime Labyrinth
+#  Export computed rows once, then query rooms by their attributes
+# -----------------------------------------
+
+import sqlite3
+import sys
+
+import labyrinth_engine as le
+import labyrinth_search as ls
+import labyrinth_story as story
+
+
+# ---------- SCHEMA ----------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    id          INTEGER PRIMARY KEY,   -- le.room_id(p, h)
+    p           INTEGER NOT NULL,
+    a           INTEGER NOT NULL,
+    b           INTEGER NOT NULL,
+    c           INTEGER NOT NULL,
+    doors       INTEGER NOT NULL,
+    spread      INTEGER NOT NULL,
+    parity_code TEXT    NOT NULL,
+    mod9        INTEGER NOT NULL,
+    apex        INTEGER NOT NULL,
+    reachable   INTEGER NOT NULL       -- 1 if reachable from the default start
+);
+CREATE INDEX IF NOT EXISTS rooms_p         ON rooms (p);
+CREATE INDEX IF NOT EXISTS rooms_doors     ON rooms (doors);
+CREATE INDEX IF NOT EXISTS rooms_spread    ON rooms (spread);
+CREATE INDEX IF NOT EXISTS rooms_parity    ON rooms (parity_code);
+CREATE INDEX IF NOT EXISTS rooms_mod9      ON rooms (mod9);
+CREATE INDEX IF NOT EXISTS rooms_reachable ON rooms (reachable);
+"""
+# Room ids sort by (p, a, b), so a p range is a rowid range and every index
+# above (which SQLite suffixes with the rowid) is already in (attr, p) order.
+# rooms_p turns p bounds into the id bounds of the stored rooms.
+
+MAX_DOORS = 27   # 3 choices for each of a, b, c
+
+
+def open_catalog(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ---------- EXPORT ----------
+
+def export_catalog(path: str, start: int, end: int) -> int:
+    """
+    Compute every room for primes start <= p <= end and load it into the
+    catalog at path (existing rooms are replaced). Attributes come from
+    labyrinth_story.build_signature; reachability is propagated forward
+    row by row from (DEFAULT_START_P, DEFAULT_START_H), so rows between
+    the start room and `start` are computed but not stored.
+    Returns the number of rooms written.
+    """
+    start_p = ls.DEFAULT_START_P
+    reachable = set()   # room ids reachable in the current row
+
+    conn = open_catalog(path)
+    written = 0
+    with conn:
+        for p, row, nxt in le.iter_rows(min(start, start_p), end):
+            if p == start_p:
+                reachable.add(le.room_id(start_p, ls.DEFAULT_START_H))
+
+            reachable_next = set()
+            records = []
+            for h, ds in row:
+                rid = le.room_id(p, h)
+                is_reachable = rid in reachable
+                if is_reachable:
+                    reachable_next.update(le.room_id(nxt, d) for d in ds)
+                if p < start:
+                    continue
+                sig = story.build_signature(p, h)
+                records.append((
+                    rid, p, h[0], h[1], h[2], len(ds), sig.spread,
+                    sig.parity_code, sig.mod9, sig.apex, int(is_reachable),
+                ))
+            reachable = reachable_next
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            written += len(records)
+    conn.close()
+    return written
+
+
+# ---------- QUERIES ----------
+
+def _id_bounds(conn: sqlite3.Connection, p_min, p_max):
+    """
+    (first, last) stored room id with p_min <= p <= p_max (None = open
+    end), read from the rooms_p index; (None, None) if no room matches.
+    """
+    first = conn.execute(
+        "SELECT id FROM rooms WHERE p >= ? ORDER BY p, id LIMIT 1",
+        (-1 if p_min is None else min(p_min, le.MAX_SIEVE + 1),),
+    ).fetchone()
+    last = conn.execute(
+        "SELECT id FROM rooms WHERE p <= ? ORDER BY p DESC, id DESC LIMIT 1",
+        (le.MAX_SIEVE if p_max is None else min(p_max, le.MAX_SIEVE),),
+    ).fetchone()
+    if first is None or last is None or first[0] > last[0]:
+        return None, None
+    return first[0], last[0]
+
+
+def query_rooms(conn: sqlite3.Connection,
+                p_min: int | None = None,
+                p_max: int | None = None,
+                min_doors: int | None = None,
+                max_doors: int | None = None,
+                spread: int | None = None,
+                parity_code: str | None = None,
+                mod9: int | None = None,
+                reachable: bool | None = None,
+                limit: int | None = None):
+    """
+    Rooms matching every given filter, ordered by (p, h).
+    Returns a list of (p, h, doors).
+
+    Example: all rooms with >= 5 doors between p=1000 and p=5000:
+        query_rooms(conn, p_min=1000, p_max=5000, min_doors=5)
+    """
+    door_values = None
+    id_min, id_max = _id_bounds(conn, p_min, p_max)
+    if id_min is None:
+        return []
+    if min_doors is not None or max_doors is not None:
+        # an IN list keeps the doors index usable together with the id range
+        lo = 0 if min_doors is None else max(min_doors, 0)
+        hi = MAX_DOORS if max_doors is None else min(max_doors, MAX_DOORS)
+        door_values = list(range(lo, hi + 1))
+
+    filters = [
+        ("id >= ?", id_min),
+        ("id <= ?", id_max),
+        ("spread = ?", spread),
+        ("parity_code = ?", parity_code),
+        ("mod9 = ?", mod9),
+        ("reachable = ?", None if reachable is None else int(reachable)),
+    ]
+    where = [clause for clause, value in filters if value is not None]
+    args = [value for _, value in filters if value is not None]
+    if door_values is not None:
+        where.append(f"doors IN ({', '.join('?' * len(door_values))})")
+        args.extend(door_values)
+
+    sql = "SELECT p, a, b, c, doors FROM rooms"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        args.append(limit)
+
+    return [(p, (a, b, c), doors) for p, a, b, c, doors in conn.execute(sql, args)]
+
+
+# ---------- CLI ----------
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python labyrinth_catalog.py START END FILE")
+        raise SystemExit(2)
+
+    start, end, path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    n = export_catalog(path, start, end)
+    print(f"Wrote {n} rooms to {path}.")
@@ -32,52 +32,70 @@ MAX_PRIME = 59         # safe prototype limit; we can raise this later
 def primes_for_delta(max_prime: int) -> list[int]:
     """All primes from the canonical start up to max_prime."""
     start_p = ls.DEFAULT_START_P
-    return [p for p in le.PRIMES if start_p <= p <= max_prime]
+    return le.primes_between(start_p, max_prime)
 
 
-def build_world_graph(max_prime: int):
+def iter_world_layers(max_prime: int, prefetch: int = 0, workers: int = 0):
+    """
+    Streaming form of build_world_graph, one prime row at a time.
+
+    Yields (p, layer, rooms, edges) where rooms are the h-sets of row p
+    and edges are (room id, room id) pairs into the next row (empty when
+    the next prime is past max_prime). Only the current row is kept, so
+    long sweeps run in bounded memory. workers > 0 builds the rows on a
+    process pool of that size.
+    """
+    if workers:
+        rows = le.iter_rows_parallel(ls.DEFAULT_START_P, max_prime, workers)
+    else:
+        rows = le.iter_rows(ls.DEFAULT_START_P, max_prime, prefetch=prefetch)
+    for layer, (p, row, nxt) in enumerate(rows):
+        rooms = [h for h, _doors in row]
+        if nxt is None or nxt > max_prime:
+            edges = []
+        else:
+            edges = [
+                (le.room_id(p, h), le.room_id(nxt, target_h))
+                for h, doors in row
+                for target_h in doors
+            ]
+        yield p, layer, rooms, edges
+
+
+def build_world_graph(max_prime: int, workers: int = 0):
     """
     Build world graph of rooms.
 
+    Nodes and edges are keyed by packed room ids (le.room_id).
+
     Returns:
-      nodes: dict[(p,h)] -> {"p": int, "h": tuple, "layer": int}
-      edges: list[((p,h), (p2,h2))]
+      nodes: dict[room id] -> {"p": int, "h": tuple, "layer": int}
+      edges: list[(room id, room id)]
     """
-    nodes: dict[tuple[int, tuple[int, int, int]], dict] = {}
-    edges: list[tuple[tuple[int, tuple[int, int, int]], tuple[int, tuple[int, int, int]]]] = []
+    nodes: dict[int, dict] = {}
+    edges: list[tuple[int, int]] = []
 
     primes = primes_for_delta(max_prime)
 
-    # Map prime -> layer index
-    layer_for_prime = {p: i for i, p in enumerate(primes)}
-
-    for p in primes:
-        layer = layer_for_prime[p]
-        row, nxt = le.build_row(p)   # row: list[(h, doors)]
-
+    for p, layer, rooms, row_edges in iter_world_layers(max_prime, workers=workers):
         # Ensure all rooms for this prime exist as nodes
-        for h, doors in row:
-            key = (p, h)
+        for h in rooms:
+            key = le.room_id(p, h)
             if key not in nodes:
                 nodes[key] = {"p": p, "h": h, "layer": layer}
 
         # Edges to next prime
-        if nxt is None or nxt > max_prime:
-            continue
-
-        for h, doors in row:
-            src_key = (p, h)
-            for target_h in doors:
-                dst_key = (nxt, target_h)
-                edges.append((src_key, dst_key))
-
-                # Make sure the destination node exists as a node too
-                if dst_key not in nodes:
-                    nodes[dst_key] = {
-                        "p": nxt,
-                        "h": target_h,
-                        "layer": layer_for_prime[nxt],
-                    }
+        for src_key, dst_key in row_edges:
+            edges.append((src_key, dst_key))
+
+            # Make sure the destination node exists as a node too
+            if dst_key not in nodes:
+                nxt, target_h = le.room_from_id(dst_key)
+                nodes[dst_key] = {
+                    "p": nxt,
+                    "h": target_h,
+                    "layer": layer + 1,
+                }
 
     return nodes, edges, primes
 
@@ -91,15 +109,15 @@ def compute_positions(nodes: dict, width: int, height: int):
       - rooms within a row are spaced evenly
     """
     # Collect keys per layer
-    by_layer: dict[int, list[tuple[int, tuple[int, int, int]]]] = defaultdict(list)
+    by_layer: dict[int, list[int]] = defaultdict(list)
     for key, meta in nodes.items():
         by_layer[meta["layer"]].append(key)
 
-    positions: dict[tuple[int, tuple[int, int, int]], tuple[float, float]] = {}
+    positions: dict[int, tuple[float, float]] = {}
 
     for layer, keys in by_layer.items():
-        # Sort for stability by h-set
-        keys.sort(key=lambda k: k[1])
+        # Sort for stability by h-set (room ids sort like h within a row)
+        keys.sort()
 
         n = len(keys)
         if n == 0:
@@ -140,7 +158,7 @@ def draw_delta(screen, nodes, edges, positions, offset, zoom):
 
     # Draw nodes
     for key, meta in nodes.items():
-        p, h = key
+        p, h = meta["p"], meta["h"]
         x, y = world_to_screen(positions[key], offset, zoom)
 
         # Highlight the canonical start room
@@ -5,7 +5,19 @@
 #  In full mode, rooms reachable from the previous row are marked with *
 # -----------------------------------------
 
-from itertools import combinations
+import math
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import combinations, compress
+
+try:
+    import numpy as np
+except ImportError:   # optional: the pure-Python row builder is always there
+    np = None
 
 # ---------- PRIME ENGINE ----------
 
@@ -22,22 +34,145 @@ def primes_up_to(n: int):
         p += 1
     return [i for i in range(n + 1) if sieve[i]]
 
+# The prime table starts at MAX_N and grows on demand: asking for a prime
+# (or the neighbour of a prime) beyond the sieved limit sieves further
+# segments of SEGMENT_SIZE numbers and appends them to the tables below.
 MAX_N = 2000
+SEGMENT_SIZE = 1 << 16
+# The table never grows past MAX_SIEVE (whole rows stop there); primality and
+# next/prev prime switch to Miller-Rabin (deterministic below 2^64).
+MAX_SIEVE = 10 ** 7
+
 PRIMES = primes_up_to(MAX_N)
 PRIME_SET = set(PRIMES)
 PRIME_INDEX = {p: i for i, p in enumerate(PRIMES)}
+_sieved_to = MAX_N   # every integer <= _sieved_to has been sieved
+
+# primality bitmap for 0.._sieved_to (1 = prime), grown alongside PRIMES
+_prime_flags = bytearray(MAX_N + 1)
+for _p in PRIMES:
+    _prime_flags[_p] = 1
+del _p
+
+def _sieve_segment(lo: int, hi: int):
+    """
+    Primality flags for [lo, hi], using the table as base primes.
+    Requires the table to already cover sqrt(hi).
+    """
+    seg = bytearray([1]) * (hi - lo + 1)
+    for q in PRIMES:
+        if q * q > hi:
+            break
+        start = max(q * q, -(-lo // q) * q)
+        if start > hi:
+            continue
+        seg[start - lo::q] = bytes((hi - start) // q + 1)
+    return seg
+
+def extend_primes(n: int):
+    """
+    Grow PRIMES / PRIME_SET / PRIME_INDEX so they cover every prime <= n
+    (never past MAX_SIEVE). The table at least doubles each time, so
+    repeated small requests past the end stay cheap.
+    """
+    global _sieved_to
+    n = min(n, MAX_SIEVE)
+    if n <= _sieved_to:
+        return
+    target = max(n, min(2 * _sieved_to, MAX_SIEVE))
+    while _sieved_to < target:
+        lo = _sieved_to + 1
+        hi = min(target, lo + SEGMENT_SIZE - 1)
+        seg = _sieve_segment(lo, hi)
+        found = list(compress(range(lo, hi + 1), seg))
+        _prime_flags.extend(seg)
+        base = len(PRIMES)
+        PRIMES.extend(found)
+        PRIME_SET.update(found)
+        PRIME_INDEX.update((q, base + i) for i, q in enumerate(found))
+        _sieved_to = hi
+
+# Deterministic for every n < 3.18 * 10^23 (so all 64-bit inputs);
+# a strong probable-prime test beyond that.
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+def _miller_rabin(n: int) -> bool:
+    if n < 2:
+        return False
+    for q in _MR_BASES:
+        if n % q == 0:
+            return n == q
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def is_prime(n: int) -> bool:
+    if n > _sieved_to:
+        if n > MAX_SIEVE:
+            return _miller_rabin(n)
+        extend_primes(n)
+    return n in PRIME_SET
+
+def _require_table(n: int):
+    """Whole-row work needs the prime table, which stops at MAX_SIEVE."""
+    if n > MAX_SIEVE:
+        raise ValueError(f"{n} is beyond the prime table limit ({MAX_SIEVE})")
+
+def primes_between(lo: int, hi: int):
+    """All primes p with lo <= p <= hi, in increasing order (hi <= MAX_SIEVE)."""
+    _require_table(hi)
+    extend_primes(hi)
+    return PRIMES[bisect_left(PRIMES, lo):bisect_right(PRIMES, hi)]
 
 def next_prime(p: int):
-    idx = PRIME_INDEX[p]
-    if idx + 1 >= len(PRIMES):
-        return None
-    return PRIMES[idx + 1]
+    if p <= _sieved_to or p <= MAX_SIEVE:
+        if p > _sieved_to:
+            extend_primes(p)
+        idx = PRIME_INDEX[p]
+        if idx + 1 >= len(PRIMES) and _sieved_to < MAX_SIEVE:
+            # Bertrand: there is always a prime in (p, 2p)
+            extend_primes(min(2 * p, MAX_SIEVE))
+        if idx + 1 < len(PRIMES):
+            return PRIMES[idx + 1]
+    elif not _miller_rabin(p):
+        raise KeyError(p)
+
+    # past the table: odd candidates, tested one by one
+    q = p + 2
+    while not _miller_rabin(q):
+        q += 2
+    return q
 
 def prev_prime(p: int):
     if p == 2:
         return 2
-    idx = PRIME_INDEX[p]
-    return PRIMES[idx - 1]
+    if p <= _sieved_to or p <= MAX_SIEVE:
+        if p > _sieved_to:
+            extend_primes(p)
+        idx = PRIME_INDEX[p]
+        return PRIMES[idx - 1]
+    if not _miller_rabin(p):
+        raise KeyError(p)
+
+    q = p - 2
+    while q > _sieved_to:
+        if _miller_rabin(q):
+            return q
+        q -= 2
+    return PRIMES[bisect_right(PRIMES, q) - 1]
 
 # ---------- LABYRINTH RULES ----------
 
@@ -48,57 +183,712 @@ def neighbours(p: int):
         vals.append(nxt)
     return vals
 
+_NEIGHBOUR_TABLE = {}   # prime -> sorted distinct (prev, p, next)
+
+def _neighbour_table(p: int):
+    vals = _NEIGHBOUR_TABLE.get(p)
+    if vals is None:
+        vals = tuple(sorted(set(neighbours(p))))
+        _NEIGHBOUR_TABLE[p] = vals
+    return vals
+
 def doors_out_of(hset, target_prime: int):
-    a, b, c = hset
-    doors = set()
-    for aa in neighbours(a):
-        for bb in neighbours(b):
-            for cc in neighbours(c):
-                if aa + bb + cc == target_prime:
-                    doors.add(tuple(sorted((aa, bb, cc))))
-    return sorted(doors)
+    """
+    Sorted list of distinct doors (aa, bb, cc) with each value a neighbour
+    of the matching value of hset and aa + bb + cc == target_prime.
+
+    Neighbour tables are monotone in p, so every door can be reached with
+    aa <= bb <= cc when a <= b <= c. Enumerating only those assignments
+    yields each door once, already in sorted order, and cc is fixed by
+    the gap: it only needs a membership test in c's table.
+    """
+    a, b, c = sorted(hset)
+    nc = _neighbour_table(c)
+    doors = []
+    for aa in _neighbour_table(a):
+        for bb in _neighbour_table(b):
+            if bb < aa:
+                continue
+            cc = target_prime - aa - bb
+            if cc < bb:
+                break
+            if cc in nc:
+                doors.append((aa, bb, cc))
+    return doors
+
+# ---------- ROOM IDS ----------
+
+# A room (p, (a, b, c)) packs into one 64-bit int: the prime index of p,
+# then the prime indices of a and b (c = p - a - b is implied). Ids sort
+# like (p, h), and decoding is three table lookups. Ids need the prime
+# table, so they exist only for p <= MAX_SIEVE (well inside the 21-bit
+# fields); room_key falls back to (p, h) beyond that.
+ROOM_ID_FIELD_BITS = 21
+_ROOM_ID_MASK = (1 << ROOM_ID_FIELD_BITS) - 1
+
+# what room_key returns: a room id, or (p, h) past the table
+RoomKey = int | tuple[int, tuple[int, int, int]]
+
+def _prime_index(q: int) -> int:
+    if q > _sieved_to:
+        extend_primes(q)
+    return PRIME_INDEX[q]
+
+def room_id(p: int, h) -> int:
+    """
+    Packed id of room h at prime p. KeyError if a value is not prime,
+    ValueError if p, a or b is past MAX_SIEVE (the table is never
+    extended beyond it for an id).
+    """
+    a, b, _ = h
+    if max(p, a, b) > MAX_SIEVE:
+        raise ValueError(f"room ({p}, {tuple(h)}) is too large for a room id")
+    pi = _prime_index(p)
+    return (pi << (2 * ROOM_ID_FIELD_BITS)) | (_prime_index(a) << ROOM_ID_FIELD_BITS) | _prime_index(b)
+
+def room_key(p: int, h) -> RoomKey:
+    """
+    Dict key for room (p, h): room_id(p, h) where it exists, otherwise
+    the (p, h) tuple itself (rooms past MAX_SIEVE, or h not all prime).
+    """
+    try:
+        return room_id(p, h)
+    except (KeyError, ValueError):
+        return (p, tuple(h))
+
+def room_from_id(rid: int):
+    """Inverse of room_id: returns (p, h)."""
+    p = PRIMES[rid >> (2 * ROOM_ID_FIELD_BITS)]
+    a = PRIMES[(rid >> ROOM_ID_FIELD_BITS) & _ROOM_ID_MASK]
+    b = PRIMES[rid & _ROOM_ID_MASK]
+    return p, (a, b, p - a - b)
+
+def room_prime(rid: int) -> int:
+    return PRIMES[rid >> (2 * ROOM_ID_FIELD_BITS)]
+
+# ---------- ROW REPRESENTATION ----------
+
+def room_position(a_col, b_col, c_col, h):
+    """
+    Position of room h in sorted a, b, c columns (a Row's, or columns
+    kept apart from their Row), or None.
+    """
+    if len(h) != 3:
+        return None
+    a, b, c = h
+    lo = bisect_left(a_col, a)
+    hi = bisect_right(a_col, a, lo)
+    i = bisect_left(b_col, b, lo, hi)
+    if i < hi and b_col[i] == b and c_col[i] == c:
+        return i
+    return None
+
+class Row:
+    """
+    One prime's row in array('I') columns: room values a, b, c, plus
+    CSR-style door_offsets into door_targets (flattened aa, bb, cc
+    triples). Room i has doors door_offsets[i] .. door_offsets[i + 1] - 1.
+
+    It still reads like the old list of (h, doors): len(), iteration,
+    row[i] and == against such a list all work, with h and every door
+    materialised as tuples on access.
+    """
+
+    __slots__ = ("p", "nxt", "a", "b", "c", "door_offsets", "door_targets")
+
+    def __init__(self, p: int, nxt):
+        self.p = p
+        self.nxt = nxt
+        self.a = array("I")
+        self.b = array("I")
+        self.c = array("I")
+        self.door_offsets = array("I", [0])
+        self.door_targets = array("I")
+
+    def append(self, h, doors):
+        a, b, c = h
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        for d in doors:
+            self.door_targets.extend(d)
+        self.door_offsets.append(len(self.door_targets) // 3)
+
+    def __len__(self):
+        return len(self.a)
+
+    def room(self, i: int):
+        return (self.a[i], self.b[i], self.c[i])
+
+    def doors_at(self, i: int):
+        t = self.door_targets
+        lo = 3 * self.door_offsets[i]
+        hi = 3 * self.door_offsets[i + 1]
+        return [(t[k], t[k + 1], t[k + 2]) for k in range(lo, hi, 3)]
+
+    def door_count(self, i: int) -> int:
+        return self.door_offsets[i + 1] - self.door_offsets[i]
+
+    def door_counts(self):
+        offsets = self.door_offsets
+        return [offsets[i + 1] - offsets[i] for i in range(len(self.a))]
+
+    def index_of(self, h):
+        """Position of room h in the row, or None (rooms are sorted)."""
+        return room_position(self.a, self.b, self.c, h)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("row index out of range")
+        return self.room(i), self.doors_at(i)
+
+    def __iter__(self):
+        for i in range(len(self.a)):
+            yield self.room(i), self.doors_at(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (Row, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return (f"Row(p={self.p}, nxt={self.nxt}, rooms={len(self)}, "
+                f"doors={len(self.door_targets) // 3})")
+
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self)
+        for col in (self.a, self.b, self.c, self.door_offsets, self.door_targets):
+            size += sys.getsizeof(col)
+        return size
 
 # ---------- ROW BUILDING ----------
 
-def build_row(p: int):
+def compute_row(p: int):
     """
-    Returns: (row, nxt)
-    row is a list of (h, doors), nxt is the next prime.
+    Uncached row construction; see build_row.
+    Uses the NumPy backend for large rows when NumPy is installed.
+    ValueError for p > MAX_SIEVE (single rooms there: see doors_for).
     """
+    _require_table(p)
     nxt = next_prime(p)
     if nxt is None:
-        return [], None
+        return Row(p, None), None
+    extend_primes(p)   # the bitmap must cover every c < p
+    if np is not None and p >= NUMPY_ROW_MIN_P:
+        return compute_row_numpy(p)
 
-    row = []
-    for i, a in enumerate(PRIMES):
-        if a > p:
-            break
-        for j in range(i, len(PRIMES)):
-            b = PRIMES[j]
-            if a + b > p:
-                break
-            c = p - a - b
-            if c < b:
-                break
-            if c in PRIME_SET:
+    # a <= b <= c with a + b + c = p bounds a by p/3 and, for a given a,
+    # b by (p - a)/2; both bounds come from bisect on the sorted table,
+    # so the inner loop only tests c against the primality bitmap.
+    flags = _prime_flags
+    row = Row(p, nxt)
+    a_end = bisect_right(PRIMES, p // 3)
+    for i in range(a_end):
+        a = PRIMES[i]
+        rest = p - a
+        b_end = bisect_right(PRIMES, rest // 2, i)
+        for b in PRIMES[i:b_end]:
+            c = rest - b
+            if flags[c]:
                 h = (a, b, c)
-                ds = doors_out_of(h, nxt)
-                row.append((h, ds))
+                row.append(h, doors_out_of(h, nxt))
     return row, nxt
 
+# ---------- NUMPY ROW BACKEND ----------
+
+# Below this prime the pure-Python builder wins (array setup dominates).
+NUMPY_ROW_MIN_P = 1000
+NUMPY_ROOM_CHUNK = 1 << 16   # rooms per 27-way broadcast block
+NUMPY_GRID_CELLS = 1 << 22   # (a, b) candidates per enumeration block
+
+def _row_arrays_numpy(p: int):
+    """
+    Vectorized core of compute_row_numpy.
+    Returns: (rooms, doors_mask, nbr, nxt)
+      rooms       (n, 3) array of a <= b <= c
+      doors_mask  (n, 3, 3, 3) bool, True where neighbour slots
+                  (i, j, k) of (a, b, c) form a door
+      nbr         (n, 3, 3) sorted neighbour values per room value
+    Only sorted assignments (aa <= bb <= cc) are flagged, as in
+    doors_out_of, so every door appears exactly once.
+    """
+    nxt = next_prime(p)
+    primes = np.array(PRIMES[:PRIME_INDEX[nxt] + 2], dtype=np.int64)
+    flags = np.frombuffer(bytes(_prime_flags[:p + 1]), dtype=np.uint8)
+
+    # all (a, b, c) candidates as an (a x b) grid, in blocks of a-values
+    a_all = primes[:int(np.searchsorted(primes, p // 3, side="right"))]
+    b_all = primes[:int(np.searchsorted(primes, p // 2, side="right"))]
+    step = max(1, NUMPY_GRID_CELLS // max(b_all.size, 1))
+    parts = []
+    for lo in range(0, a_all.size, step):
+        a = a_all[lo:lo + step, None]
+        c = p - a - b_all[None, :]
+        keep = (b_all[None, :] >= a) & (c >= b_all[None, :])
+        keep[keep] = flags[c[keep]].astype(bool)
+        ai, bi = np.nonzero(keep)
+        if ai.size:
+            parts.append(np.stack([a[ai, 0], b_all[bi], c[ai, bi]], axis=1))
+    if not parts:
+        empty = np.zeros((0, 3), dtype=np.int64)
+        return empty, np.zeros((0, 3, 3, 3), dtype=bool), np.zeros((0, 3, 3), dtype=np.int64), nxt
+    rooms = np.concatenate(parts)
+
+    # (prev, x, next) for every room value; prev(2) == 2 is a duplicate
+    # slot, so it is pushed to -1 to keep it out of every sum.
+    pos = np.searchsorted(primes, rooms)
+    prev = primes[np.maximum(pos - 1, 0)]
+    prev = np.where(rooms == 2, -1, prev)
+    nbr = np.stack([prev, rooms, primes[pos + 1]], axis=2)
+
+    masks = []
+    for lo in range(0, rooms.shape[0], NUMPY_ROOM_CHUNK):
+        na = nbr[lo:lo + NUMPY_ROOM_CHUNK, 0, :, None, None]
+        nb = nbr[lo:lo + NUMPY_ROOM_CHUNK, 1, None, :, None]
+        nc = nbr[lo:lo + NUMPY_ROOM_CHUNK, 2, None, None, :]
+        masks.append(
+            (na + nb + nc == nxt) & (na >= 0) & (na <= nb) & (nb <= nc)
+        )
+    return rooms, np.concatenate(masks), nbr, nxt
+
+def _as_column(values):
+    """NumPy integer array -> array('I') (np.uintc is C unsigned int)."""
+    return array("I", np.ascontiguousarray(values, dtype=np.uintc).tobytes())
+
+def compute_row_numpy(p: int):
+    """
+    Same result as compute_row, built with NumPy arrays and copied
+    straight into the Row columns.
+    """
+    rooms, mask, nbr, nxt = _row_arrays_numpy(p)
+    room_idx, i, j, k = np.nonzero(mask)
+    targets = np.stack(
+        [nbr[room_idx, 0, i], nbr[room_idx, 1, j], nbr[room_idx, 2, k]], axis=1
+    )
+    offsets = np.zeros(rooms.shape[0] + 1, dtype=np.int64)
+    np.cumsum(mask.sum(axis=(1, 2, 3)), out=offsets[1:])
+
+    row = Row(p, nxt)
+    row.a = _as_column(rooms[:, 0])
+    row.b = _as_column(rooms[:, 1])
+    row.c = _as_column(rooms[:, 2])
+    row.door_offsets = _as_column(offsets)
+    row.door_targets = _as_column(targets.ravel())
+    return row, nxt
+
+# ---------- ROOM COUNTS ----------
+
+def _convolve_counts(x, y, n: int):
+    """Exact integer convolution of x and y, truncated to indices 0..n."""
+    size = 1 << (2 * n + 1).bit_length()
+    fx = np.fft.rfft(x, size)
+    fy = fx if y is x else np.fft.rfft(y, size)
+    return np.rint(np.fft.irfft(fx * fy, size)[:n + 1]).astype(np.int64)
+
+def room_counts(n: int):
+    """
+    Number of rooms (len(build_row(p)[0])) for every prime p <= n,
+    as a dict p -> count, without building any row. Requires NumPy.
+
+    Rooms are multisets {a, b, c} of primes with a + b + c = p. With f
+    the prime indicator, f*f*f counts ordered triples T; Burnside over
+    the permutations of three slots gives
+        rooms = (T + 3 * P + 2 * E) / 6
+    where P counts ordered (a, c) with 2a + c = p and E = f(p / 3).
+    """
+    if np is None:
+        raise ImportError("room_counts needs NumPy (pip install numpy)")
+    if n < 2:
+        return {}
+    _require_table(n)
+    extend_primes(n)
+    f = np.frombuffer(bytes(_prime_flags[:n + 1]), dtype=np.uint8).astype(np.float64)
+
+    pairs = _convolve_counts(f, f, n)
+    ordered = _convolve_counts(pairs.astype(np.float64), f, n)
+
+    doubled = np.zeros(n + 1)
+    doubled[0:n + 1:2] = f[:n // 2 + 1]
+    two_equal = _convolve_counts(doubled, f, n)
+
+    all_equal = np.zeros(n + 1, dtype=np.int64)
+    all_equal[0:n + 1:3] = f[:n // 3 + 1]
+
+    rooms = (ordered + 3 * two_equal + 2 * all_equal) // 6
+    return {p: int(rooms[p]) for p in primes_between(2, n)}
+
+# ---------- ROW STORES ----------
+
+# Read-only precomputed stores (see labyrinth_store.RowStore). When one
+# covers a prime, build_row and doors_for read from it instead of
+# computing.
+_row_stores = []
+
+def attach_store(store):
+    if store not in _row_stores:
+        _row_stores.append(store)
+
+def detach_store(store):
+    if store in _row_stores:
+        _row_stores.remove(store)
+
+def _store_for(p: int):
+    for store in _row_stores:
+        if store.covers(p):
+            return store
+    return None
+
+# ---------- ROW CACHE ----------
+
+# Rows are pure functions of p, so build_row keeps recently used rows in an
+# LRU cache bounded by an (estimated) memory budget in bytes.
+ROW_CACHE_BUDGET = 64 * 1024 * 1024
+
+_row_cache = OrderedDict()   # p -> [row, nxt, nbytes], oldest first
+_row_cache_counters = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+def _evict_rows(budget: int):
+    while _row_cache and _row_cache_counters["bytes"] > budget:
+        _, entry = _row_cache.popitem(last=False)
+        _row_cache_counters["bytes"] -= entry[2]
+        _row_cache_counters["evictions"] += 1
+
+def set_row_cache_budget(nbytes: int):
+    """Change the cache budget (bytes); 0 disables row caching."""
+    global ROW_CACHE_BUDGET
+    ROW_CACHE_BUDGET = max(0, int(nbytes))
+    _evict_rows(ROW_CACHE_BUDGET)
+
+def clear_row_cache():
+    _row_cache.clear()
+    for key in _row_cache_counters:
+        _row_cache_counters[key] = 0
+
+def row_cache_stats() -> dict:
+    """
+    Returns a dict with hits, misses, evictions, bytes (held),
+    rows (held) and budget.
+    """
+    stats = dict(_row_cache_counters)
+    stats["rows"] = len(_row_cache)
+    stats["budget"] = ROW_CACHE_BUDGET
+    return stats
+
+def build_row(p: int):
+    """
+    Returns: (row, nxt)
+    row is a Row (reads as a list of (h, doors)), nxt is the next prime.
+    Rows are cached and shared between callers: do not mutate them.
+    """
+    cached = _row_cache.get(p)
+    if cached is not None:
+        _row_cache.move_to_end(p)
+        _row_cache_counters["hits"] += 1
+        return cached[0], cached[1]
+
+    _row_cache_counters["misses"] += 1
+    store = _store_for(p) if _row_stores else None
+    if store is not None:
+        row, nxt = store.row(p)
+    else:
+        row, nxt = compute_row(p)
+    nbytes = row.nbytes()
+    if nbytes <= ROW_CACHE_BUDGET:
+        _row_cache[p] = [row, nxt, nbytes]
+        _row_cache_counters["bytes"] += nbytes
+        _evict_rows(ROW_CACHE_BUDGET)
+    return row, nxt
+
+def is_room(p: int, h) -> bool:
+    """True if h = (a, b, c) is a room of prime p (a <= b <= c, all prime)."""
+    if len(h) != 3:
+        return False
+    a, b, c = h
+    return (
+        a <= b <= c
+        and a + b + c == p
+        and is_prime(p)
+        and is_prime(a) and is_prime(b) and is_prime(c)
+    )
+
+def doors_for(p: int, h):
+    """
+    Doors out of a single room, without building the whole row.
+    Returns: (doors, nxt)
+    doors is None if h is not a room of p; nxt is None if p is not prime.
+    """
+    h = tuple(h)
+    if p in _row_cache:
+        row, nxt = build_row(p)
+        i = row.index_of(h)
+        return (None if i is None else row.doors_at(i)), nxt
+
+    store = _store_for(p) if _row_stores else None
+    if store is not None:
+        return store.doors_for(p, h)
+
+    if not is_prime(p):
+        return None, None
+    nxt = next_prime(p)
+    if not is_room(p, h):
+        return None, nxt
+    return doors_out_of(h, nxt), nxt
+
+# ---------- REVERSE DOORS ----------
+
+def predecessors(p: int, h):
+    """
+    Rooms at prev_prime(p) that have a door into (p, h), sorted.
+    Empty if h is not a room of p (or p == 2).
+
+    The neighbour relation is symmetric (y is a neighbour of x exactly
+    when x is a neighbour of y), so the rooms with a door into h are the
+    "doors" of h aimed back at the previous prime: no previous row is
+    built.
+    """
+    h = tuple(h)
+    if p <= 2 or not is_room(p, h):
+        return []
+    return doors_out_of(h, prev_prime(p))
+
+# ---------- DOOR LINKS ----------
+
+# Door arrays (one entry per door) shorter than this are walked in pure
+# Python: below it NumPy's setup costs more than the loop.
+NUMPY_DOORS_MIN = 256
+
+def door_links(row, next_row):
+    """
+    Door targets of row as positions in next_row (the row of row.nxt).
+    Returns array('I') with one entry per door, in door order, so room
+    i's doors lead to rooms links[row.door_offsets[i]:row.door_offsets[i + 1]]
+    of next_row.
+    """
+    t = row.door_targets
+    if not t:
+        return array("I")
+
+    # next_row is sorted by (a, b) and b < p, so a * (p + 1) + b is a
+    # sorted key that identifies a room
+    w = next_row.p + 1
+    if np is not None and len(t) // 3 >= NUMPY_DOORS_MIN:
+        keys = np.frombuffer(next_row.a, dtype=np.uintc).astype(np.int64) * w
+        keys += np.frombuffer(next_row.b, dtype=np.uintc)
+        tt = np.frombuffer(t, dtype=np.uintc).reshape(-1, 3).astype(np.int64)
+        return _as_column(np.searchsorted(keys, tt[:, 0] * w + tt[:, 1]))
+
+    pos = {a * w + b: i for i, (a, b) in enumerate(zip(next_row.a, next_row.b))}
+    return array("I", [pos[t[k] * w + t[k + 1]] for k in range(0, len(t), 3)])
+
+# ---------- ROW STREAMING ----------
+
+def iter_rows_for(primes, prefetch: int = 0, executor=None):
+    """
+    Yields (p, row, nxt) for each prime in primes, in the given order.
+
+    Rows are computed with compute_row and bypass the row cache, so the
+    generator itself never holds more than prefetch + 1 rows. With
+    prefetch > 0 the next rows are computed ahead on executor (a
+    ThreadPoolExecutor of that size when None; any
+    concurrent.futures executor, including a process pool, works).
+    """
+    if prefetch <= 0:
+        for p in primes:
+            row, nxt = compute_row(p)
+            yield p, row, nxt
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+    pending = deque()
+    try:
+        for p in primes:
+            pending.append((p, executor.submit(compute_row, p)))
+            if len(pending) > prefetch:
+                q, future = pending.popleft()
+                row, nxt = future.result()
+                yield q, row, nxt
+        while pending:
+            q, future = pending.popleft()
+            row, nxt = future.result()
+            yield q, row, nxt
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_rows(start: int, end: int, prefetch: int = 0, executor=None):
+    """
+    Streaming range API: yields (p, row, nxt) for every prime
+    start <= p <= end, in increasing order. See iter_rows_for.
+    """
+    return iter_rows_for(primes_between(start, end), prefetch, executor)
+
+# ---------- PARALLEL RANGES ----------
+
+def row_cost(p: int) -> float:
+    """Expected relative cost of build_row(p), about pi(p)^2."""
+    if p < 3:
+        return 1.0
+    return (p / math.log(p)) ** 2
+
+# Cost budget per shard: about row_cost(9_000), i.e. a tenth of a second
+# of row building and a MB or so of rows. Row bytes grow no faster than
+# row_cost, so the 2 * workers shards in flight stay bounded however
+# wide the range is.
+SHARD_COST = 1_000_000
+
+def shard_primes(primes, max_cost: float = SHARD_COST):
+    """
+    Split primes into contiguous shards of at most max_cost total
+    row_cost (a prime costlier than that gets a shard of its own),
+    keeping the original order.
+    """
+    shards = []
+    weight = max_cost
+    for p in primes:
+        cost = row_cost(p)
+        if weight + cost > max_cost:
+            shards.append([])
+            weight = 0.0
+        shards[-1].append(p)
+        weight += cost
+    return shards
+
+def _compute_shard(primes):
+    return [(p,) + compute_row(p) for p in primes]
+
+def _iter_sharded(shard_fn, primes, workers: int | None):
+    """
+    Run shard_fn (a module-level function: list of primes -> list of
+    results) over cost-bounded shards of primes on a process pool and
+    yield the results in order. At most 2 * workers shards are in
+    flight at once, so memory is capped by SHARD_COST rather than the
+    range size; workers == 1 runs the shards in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_primes(primes)
+    if workers == 1 or len(shards) <= 1:
+        for shard in shards:
+            yield from shard_fn(shard)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for shard in shards:
+                pending.append(pool.submit(shard_fn, shard))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def iter_rows_parallel_for(primes, workers: int | None = None):
+    """
+    Like iter_rows_for, but shards the primes across a process pool.
+    Rows come back in order; at most 2 * workers shards of SHARD_COST
+    are held at once.
+    """
+    return _iter_sharded(_compute_shard, primes, workers)
+
+def iter_rows_parallel(start: int, end: int, workers: int | None = None):
+    """
+    Parallel range API: yields (p, row, nxt) for every prime
+    start <= p <= end, in increasing order.
+    """
+    return iter_rows_parallel_for(primes_between(start, end), workers)
+
 # ---------- COMPACT SIGNATURE ----------
 
+def _count_doors(h, target_prime: int) -> int:
+    """len(doors_out_of(h, target_prime)) for a sorted h, allocation-free."""
+    a, b, c = h
+    nc = _neighbour_table(c)
+    n = 0
+    for aa in _neighbour_table(a):
+        for bb in _neighbour_table(b):
+            if bb < aa:
+                continue
+            cc = target_prime - aa - bb
+            if cc < bb:
+                break
+            if cc in nc:
+                n += 1
+    return n
+
+def row_signature(p: int):
+    """
+    Returns: (counts, nxt)
+    counts[i] is the number of doors out of the i-th room of row p (rooms
+    in build_row order), computed without building any door tuples.
+    ValueError for p > MAX_SIEVE, as for compute_row.
+    """
+    _require_table(p)
+    nxt = next_prime(p)
+    if nxt is None:
+        return [], None
+
+    cached = _row_cache.get(p)
+    if cached is not None:
+        return cached[0].door_counts(), nxt
+
+    extend_primes(p)
+    if np is not None and p >= NUMPY_ROW_MIN_P:
+        _, mask, _, nxt = _row_arrays_numpy(p)
+        return mask.sum(axis=(1, 2, 3)).tolist(), nxt
+
+    flags = _prime_flags
+    counts = []
+    a_end = bisect_right(PRIMES, p // 3)
+    for i in range(a_end):
+        a = PRIMES[i]
+        rest = p - a
+        b_end = bisect_right(PRIMES, rest // 2, i)
+        for b in PRIMES[i:b_end]:
+            if flags[rest - b]:
+                counts.append(_count_doors((a, b, rest - b), nxt))
+    return counts, nxt
+
+def _signature_shard(primes):
+    return [(p,) + row_signature(p) for p in primes]
+
+def iter_signatures_for(primes, workers: int | None = 1):
+    """
+    Yields (p, counts, nxt) for each prime in primes, in order.
+    workers != 1 shards the work across a process pool (None = all cores).
+    """
+    return _iter_sharded(_signature_shard, primes, workers)
+
+def iter_signatures(start: int, end: int, workers: int | None = 1):
+    """Signature range API; see iter_signatures_for."""
+    return iter_signatures_for(primes_between(start, end), workers)
+
 def print_compact_prime(p: int):
-    if p not in PRIME_SET:
+    if p > MAX_SIEVE:
+        print(f"{p}: beyond table limit ({MAX_SIEVE}).\n")
+        return
+    if not is_prime(p):
         print(f"{p}: not a known prime.\n")
         return
 
-    row, nxt = build_row(p)
+    counts, nxt = row_signature(p)
+    print_compact_signature(p, counts, nxt)
+
+def print_compact_signature(p: int, counts, nxt):
     if nxt is None:
         print(f"{p}: no next prime found (table limit).\n")
         return
 
-    counts = [len(ds) for (_, ds) in row if ds]
+    counts = [k for k in counts if k]
 
     if not counts:
         print(f"( {p} )  -- no doors out")
@@ -108,9 +898,9 @@ def print_compact_prime(p: int):
 
 # ---------- FULL OUTPUT HELPERS ----------
 
-def print_full_row(p: int, row, nxt, reachable_current=None):
+def print_full_row(p: int, row, nxt, reachable_current: set[RoomKey] | None = None):
     """
-    reachable_current is a set of rooms (h-sets) that are
+    reachable_current is a set of room keys (see room_key) that are
     reachable from the previous prime or previous row.
     Those are marked with *.
     """
@@ -123,7 +913,7 @@ def print_full_row(p: int, row, nxt, reachable_current=None):
     for h, ds in row:
         if ds:
             any_doors = True
-            mark = "*" if h in reachable_current else ""
+            mark = "*" if room_key(p, h) in reachable_current else ""
             print(f"h={h}{mark} -> {len(ds)} doors -> {ds}")
 
     if not any_doors:
@@ -136,26 +926,22 @@ def full_single_with_prev(p: int):
     Full mode for a single prime:
     highlights rooms that are reachable from the previous prime.
     """
-    if p not in PRIME_SET:
+    if p > MAX_SIEVE:
+        print(f"{p}: beyond table limit ({MAX_SIEVE}).\n")
+        return
+    if not is_prime(p):
         print(f"{p}: not a known prime.\n")
         return
 
-    idx = PRIME_INDEX[p]
-    if idx == 0:
-        reachable_current = set()
-    else:
-        prev_p = PRIMES[idx - 1]
-        prev_row, _ = build_row(prev_p)
-        reachable_current = set()
-        for h_prev, ds in prev_row:
-            for d in ds:
-                reachable_current.add(d)
-
     row, nxt = build_row(p)
     if nxt is None:
         print(f"{p}: no next prime found (table limit).\n")
         return
 
+    reachable_current = {
+        room_key(p, h) for h, ds in row if ds and predecessors(p, h)
+    }
+
     print_full_row(p, row, nxt, reachable_current)
 
 def print_range_full(primes_in_range):
@@ -166,8 +952,7 @@ def print_range_full(primes_in_range):
     """
     reachable_current = set()
 
-    for p in primes_in_range:
-        row, nxt = build_row(p)
+    for p, row, nxt in range_rows(primes_in_range):
         if nxt is None:
             print(f"{p}: no next prime found (table limit).\n")
             continue
@@ -178,11 +963,23 @@ def print_range_full(primes_in_range):
         reachable_next = set()
         for h, ds in row:
             for d in ds:
-                reachable_next.add(d)
+                reachable_next.add(room_key(nxt, d))
         reachable_current = reachable_next
 
 # ---------- INTERACTIVE SHELL ----------
 
+# rows computed ahead of the one being printed in range mode
+RANGE_PREFETCH = 1
+# ranges with at least this many primes are built on a process pool
+PARALLEL_MIN_ROWS = 200
+RANGE_WORKERS = None   # None = os.cpu_count()
+
+def range_rows(primes_in_range):
+    """Row stream used by the CLI range modes."""
+    if len(primes_in_range) >= PARALLEL_MIN_ROWS:
+        return iter_rows_parallel_for(primes_in_range, RANGE_WORKERS)
+    return iter_rows_for(primes_in_range, prefetch=RANGE_PREFETCH)
+
 def main():
     print("\n=== Prime Labyrinth Engine ===")
     print("Default: compact row signature like  ( 19 ) (2)(3)(1)")
@@ -229,15 +1026,23 @@ def main():
             if start > end:
                 start, end = end, start
 
-            primes_in_range = [p for p in PRIMES if start <= p <= end]
+            if end > MAX_SIEVE:
+                print(f"Range beyond table limit ({MAX_SIEVE}).\n")
+                continue
+
+            primes_in_range = primes_between(start, end)
 
             if not primes_in_range:
                 print("No known primes in that range.\n")
                 continue
 
             if not full_mode:
-                for p in primes_in_range:
-                    print_compact_prime(p)
+                if len(primes_in_range) >= PARALLEL_MIN_ROWS:
+                    workers = RANGE_WORKERS
+                else:
+                    workers = 1
+                for p, counts, nxt in iter_signatures_for(primes_in_range, workers):
+                    print_compact_signature(p, counts, nxt)
                 print()
             else:
                 print_range_full(primes_in_range)
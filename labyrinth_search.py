@@ -4,9 +4,21 @@
 #  Uses labyrinth_engine as core
 # -----------------------------------------
 
+import os
 import random
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from itertools import compress
+
 import labyrinth_engine as le
 
+try:
+    import numpy as np
+except ImportError:   # optional: the bytearray frontier works without it
+    np = None
+
 
 # ---------- BASIC HELPERS ----------
 
@@ -29,16 +41,19 @@ def rooms_with_doors(p: int):
 
 # ---------- LEFT-MOST WALK (NO BACKTRACKING) ----------
 
-def leftmost_walk(start_p: int, start_h, max_steps: int = 1000):
+def leftmost_walk(start_p: int, start_h, max_steps: int = 1000,
+                  viable=None):
     """
     Always choose the lexicographically smallest door from each room.
     Returns (path, status), where:
       - path  = list of (p, h)
       - status is one of:
           "dead_end"       -> room has no doors out
+          "doomed"         -> every door leads to a doomed room (with viable)
           "no_next_prime"  -> target prime not in table
           "h_not_found"    -> start room not valid for that prime
           "max_steps"      -> safety cap reached
+    With viable = doom_map(...), doors into doomed rooms are skipped.
     """
     p = int(start_p)
     h = tuple(start_h)
@@ -51,23 +66,21 @@ def leftmost_walk(start_p: int, start_h, max_steps: int = 1000):
         if steps > max_steps:
             return path, "max_steps"
 
-        row, nxt = le.build_row(p)
-        if nxt is None:
-            return path, "no_next_prime"
-
-        # find this room
-        doors = None
-        for rh, ds in row:
-            if rh == h:
-                doors = ds
-                break
-
+        doors, nxt = le.doors_for(p, h)
         if doors is None:
             return path, "h_not_found"
 
+        if nxt is None:
+            return path, "no_next_prime"
+
         if not doors:
             return path, "dead_end"
 
+        if viable is not None:
+            doors = [d for d in doors if not is_doomed(viable, nxt, d)]
+            if not doors:
+                return path, "doomed"
+
         # left-most = sorted doors; first element
         h = doors[0]
         p = nxt
@@ -75,10 +88,11 @@ def leftmost_walk(start_p: int, start_h, max_steps: int = 1000):
 
 # ---------- MONTE CARLO WALK (NO BACKTRACKING) ----------
 
-def random_walk(start_p: int, start_h, max_steps: int = 1000, rng=None):
+def random_walk(start_p: int, start_h, max_steps: int = 1000, rng=None,
+                viable=None):
     """
     Random walk: at each step, choose a random door from the current room.
-    Returns (path, status) as per leftmost_walk.
+    Returns (path, status) as per leftmost_walk (viable likewise).
     """
     if rng is None:
         rng = random
@@ -94,22 +108,21 @@ def random_walk(start_p: int, start_h, max_steps: int = 1000, rng=None):
         if steps > max_steps:
             return path, "max_steps"
 
-        row, nxt = le.build_row(p)
-        if nxt is None:
-            return path, "no_next_prime"
-
-        doors = None
-        for rh, ds in row:
-            if rh == h:
-                doors = ds
-                break
-
+        doors, nxt = le.doors_for(p, h)
         if doors is None:
             return path, "h_not_found"
 
+        if nxt is None:
+            return path, "no_next_prime"
+
         if not doors:
             return path, "dead_end"
 
+        if viable is not None:
+            doors = [d for d in doors if not is_doomed(viable, nxt, d)]
+            if not doors:
+                return path, "doomed"
+
         # pick one door uniformly at random
         h = rng.choice(doors)
         p = nxt
@@ -144,7 +157,7 @@ def depth_first_explore(
       {
         "status": "completed" | "max_steps" | "start_invalid",
         "total_steps": int,           # total moves along edges
-        "total_nodes_visited": int,   # number of (p,h) frames ever pushed
+        "total_nodes_visited": int,   # number of room frames ever pushed
         "max_depth": int              # deepest stack size reached
       }
     """
@@ -152,13 +165,8 @@ def depth_first_explore(
     p0 = int(start_p)
     h0 = tuple(start_h)
 
-    # Build first row and find starting room
-    row0, nxt0 = le.build_row(p0)
-    doors0 = None
-    for rh, ds in row0:
-        if rh == h0:
-            doors0 = ds
-            break
+    # Look up the starting room directly
+    doors0, nxt0 = le.doors_for(p0, h0)
 
     if doors0 is None:
         return {
@@ -169,10 +177,8 @@ def depth_first_explore(
         }
 
     # Each stack frame:
-    # { "p": int, "h": tuple, "nxt": int|None, "doors": list, "i": next_index }
+    # { "nxt": int|None, "doors": list, "i": next_index }
     stack = [{
-        "p": p0,
-        "h": h0,
         "nxt": nxt0,
         "doors": list(doors0),
         "i": 0,
@@ -192,8 +198,6 @@ def depth_first_explore(
             }
 
         frame = stack[-1]
-        p = frame["p"]
-        h = frame["h"]
         nxt = frame["nxt"]
         doors = frame["doors"]
         i = frame["i"]
@@ -208,20 +212,13 @@ def depth_first_explore(
             if nxt is None or (max_prime is not None and nxt > max_prime):
                 continue
 
-            next_row, next_nxt = le.build_row(nxt)
-            target_doors = None
-            for rh, ds in next_row:
-                if rh == target_h:
-                    target_doors = ds
-                    break
+            target_doors, next_nxt = le.doors_for(nxt, target_h)
 
             if target_doors is None:
                 # should not happen structurally, skip if it does
                 continue
 
             new_frame = {
-                "p": nxt,
-                "h": target_h,
                 "nxt": next_nxt,
                 "doors": list(target_doors),
                 "i": 0,
@@ -252,6 +249,572 @@ def random_from_default(max_steps: int = 1000, rng=None):
     return random_walk(DEFAULT_START_P, DEFAULT_START_H, max_steps=max_steps, rng=rng)
 
 
+# ---------- DOOM ANALYSIS ----------
+
+def viable_before(row, next_row, viable_next, links=None):
+    """
+    One layer of the backward pass: viable_next is a bytearray over
+    next_row's rooms (1 = can still reach the target); returns the same
+    bitmap for row, whose rooms are viable when any door leads to a
+    viable room. links is le.door_links(row, next_row) when given.
+    """
+    if links is None:
+        links = le.door_links(row, next_row)
+    offsets = row.door_offsets
+
+    if np is not None and len(links) >= le.NUMPY_DOORS_MIN:
+        hit = np.frombuffer(viable_next, dtype=bool)[np.frombuffer(links, dtype=np.uintc)]
+        seen = np.zeros(len(hit) + 1, dtype=np.int64)
+        np.cumsum(hit, out=seen[1:])
+        off = np.frombuffer(offsets, dtype=np.uintc)
+        return bytearray((seen[off[1:]] > seen[off[:-1]]).tobytes())
+
+    return bytearray(
+        any(viable_next[t] for t in links[offsets[i]:offsets[i + 1]])
+        for i in range(len(row))
+    )
+
+
+def doom_map(target_p: int, start_p: int = DEFAULT_START_P):
+    """
+    Backward pass from target_p down to start_p.
+    Returns a dict p -> (a, b, c, bits): the row's room columns plus a
+    bytearray over its rooms (in row order), 1 if some path from the
+    room reaches the top prime (the largest prime <= target_p), 0 if the
+    room is doomed (every path dead-ends first). Every room of the top
+    prime itself is viable. Rows are streamed from the top down; only
+    the room columns and the bitmap (13 bytes per room) are kept, enough
+    for is_doomed to find a room without rebuilding its row.
+    """
+    viable = {}
+    next_row, viable_next = None, None
+    for p, row, _ in le.iter_rows_for(le.primes_between(start_p, target_p)[::-1]):
+        if next_row is None:
+            bits = bytearray(b"\x01" * len(row))
+        else:
+            bits = viable_before(row, next_row, viable_next)
+        viable[p] = (row.a, row.b, row.c, bits)
+        next_row, viable_next = row, bits
+    return viable
+
+
+def is_doomed(viable, p: int, h) -> bool:
+    """
+    True if room (p, h) cannot reach the target of viable = doom_map(...).
+    Rooms outside the map's prime range, or not rooms at all, are not
+    reported as doomed. A lookup is two bisects over the kept columns.
+    """
+    entry = viable.get(p)
+    if entry is None:
+        return False
+    a, b, c, bits = entry
+    i = le.room_position(a, b, c, h)
+    return i is not None and not bits[i]
+
+
+# ---------- DEEPEST PATHS ----------
+
+# max_prime -> {p: (best, choice, a, b, c, nxt)} for a run of primes up to
+# max_prime; the room columns let paths be read back without any row
+_deepest_memo = {}
+
+
+def best_before(row, next_row, best_next, links=None):
+    """
+    One layer of the longest-path pass. best_next[j] is how many more
+    primes room j of next_row can still climb; returns (best, choice)
+    for row as array('I'): best[i] = 1 + max over room i's doors (0 with
+    no doors) and choice[i] = next_row position of the left-most door
+    attaining it. links is le.door_links(row, next_row) when given.
+    """
+    if links is None:
+        links = le.door_links(row, next_row)
+    offsets = row.door_offsets
+    n = len(row)
+
+    if np is not None and len(links) >= le.NUMPY_DOORS_MIN:
+        off = np.frombuffer(offsets, dtype=np.uintc).astype(np.int64)
+        tgt = np.frombuffer(links, dtype=np.uintc)
+        vals = np.frombuffer(best_next, dtype=np.uintc)[tgt].astype(np.int64) + 1
+        has = off[1:] > off[:-1]
+        best = np.zeros(n, dtype=np.int64)
+        best[has] = np.maximum.reduceat(vals, off[:-1][has])
+        owner = np.repeat(np.arange(n), off[1:] - off[:-1])
+        first = np.flatnonzero(vals == best[owner])
+        rooms, at = np.unique(owner[first], return_index=True)
+        choice = np.zeros(n, dtype=np.int64)
+        choice[rooms] = tgt[first[at]]
+        return le._as_column(best), le._as_column(choice)
+
+    best = array("I", bytes(4 * n))
+    choice = array("I", bytes(4 * n))
+    for i in range(n):
+        top = 0
+        for t in links[offsets[i]:offsets[i + 1]]:
+            if best_next[t] + 1 > top:
+                top = best_next[t] + 1
+                choice[i] = t
+        best[i] = top
+    return best, choice
+
+
+def _deepest_rows(p: int, max_prime: int):
+    """
+    Memoized (best, choice, a, b, c, nxt) rows for ceiling max_prime,
+    extended down to prime p by continuing the backward pass from the
+    lowest row known (the only row that is rebuilt).
+    """
+    memo = _deepest_memo.setdefault(max_prime, {})
+    if p in memo:
+        return memo
+    if memo:
+        low = min(memo)
+        next_row, _ = le.build_row(low)
+        best_next = memo[low][0]
+        primes = le.primes_between(p, low - 1)
+    else:
+        next_row, best_next = None, None
+        primes = le.primes_between(p, max_prime)
+
+    for q, row, nxt in le.iter_rows_for(primes[::-1]):
+        if next_row is None:
+            best = choice = array("I", bytes(4 * len(row)))
+        else:
+            best, choice = best_before(row, next_row, best_next)
+        memo[q] = (best, choice, row.a, row.b, row.c, nxt)
+        next_row, best_next = row, best
+    return memo
+
+
+def deepest_path(p: int, h, max_prime: int):
+    """
+    Deepest prime reachable from room (p, h) without passing max_prime,
+    and one witness path to it (taking the left-most best door each step).
+    Returns (deepest_p, path) with path a list of (p, h), or (None, [])
+    if h is not a room of p.
+
+    Per-room depths are memoized per ceiling and only extended
+    downward, so repeated queries below the same ceiling reuse them.
+    """
+    p = int(p)
+    h = tuple(h)
+    if not le.is_room(p, h):
+        return None, []
+    if p > max_prime:
+        return p, [(p, h)]
+
+    memo = _deepest_rows(p, max_prime)
+    best, choice, a, b, c, nxt = memo[p]
+    i = le.room_position(a, b, c, h)
+    path = [(p, h)]
+    for _ in range(best[i]):
+        i = choice[i]
+        p = nxt
+        _, choice, a, b, c, nxt = memo[p]
+        path.append((p, (a[i], b[i], c[i])))
+    return p, path
+
+
+def clear_deepest_memo():
+    _deepest_memo.clear()
+
+
+# ---------- LAYERED REACHABILITY ----------
+
+def advance_frontier(row, reach, next_row, links=None):
+    """
+    One layer of BFS: reach is a bytearray over row's rooms (1 =
+    reachable); returns the same bitmap for next_row, the row of row.nxt.
+    links is le.door_links(row, next_row), computed when not given.
+    """
+    if links is None:
+        links = le.door_links(row, next_row)
+    offsets = row.door_offsets
+
+    if np is not None and len(links) >= le.NUMPY_DOORS_MIN:
+        counts = np.diff(np.frombuffer(offsets, dtype=np.uintc))
+        taken = np.repeat(np.frombuffer(reach, dtype=bool), counts)
+        out = np.zeros(len(next_row), dtype=bool)
+        out[np.frombuffer(links, dtype=np.uintc)[taken]] = True
+        return bytearray(out.tobytes())
+
+    out = bytearray(len(next_row))
+    for i in compress(range(len(row)), reach):
+        for t in links[offsets[i]:offsets[i + 1]]:
+            out[t] = 1
+    return out
+
+
+def iter_reachable_layers(start_p: int, start_h, max_prime: int):
+    """
+    Rooms reachable from (start_p, start_h), one prime at a time.
+    Yields (p, row, reach) for start_p <= p <= max_prime, where reach is
+    a bytearray over row's rooms (reach[i] == 1 if row.room(i) can be
+    reached). Stops early once a layer is empty; yields nothing if the
+    start room is not valid.
+
+    Each layer costs one pass over the row's doors, however many paths
+    lead into it.
+    """
+    p0 = int(start_p)
+    prev_row, reach = None, None
+    for p, row, nxt in le.iter_rows(p0, max_prime):
+        if prev_row is None:
+            i = row.index_of(tuple(start_h))
+            if i is None:
+                return
+            reach = bytearray(len(row))
+            reach[i] = 1
+        else:
+            reach = advance_frontier(prev_row, reach, row)
+            if not any(reach):
+                return
+        yield p, row, reach
+        prev_row = row
+
+
+def reachable_counts(start_p: int, start_h, max_prime: int):
+    """
+    Yields (p, number of reachable rooms) per prime; see
+    iter_reachable_layers.
+    """
+    for p, _, reach in iter_reachable_layers(start_p, start_h, max_prime):
+        yield p, reach.count(1)
+
+
+# ---------- PATH-COUNTING EXPLORE ----------
+
+def iter_path_counts(start_p: int, start_h, max_prime: int):
+    """
+    Number of distinct paths from (start_p, start_h) to every room, one
+    prime at a time. Yields (p, row, paths) for start_p <= p <= max_prime,
+    where paths[i] counts the paths ending at row.room(i) (exact ints).
+    Stops early once no room of a layer is reached; yields nothing if
+    the start room is not valid.
+    """
+    prev_row, paths = None, None
+    for p, row, nxt in le.iter_rows(int(start_p), max_prime):
+        if prev_row is None:
+            i = row.index_of(tuple(start_h))
+            if i is None:
+                return
+            paths = [0] * len(row)
+            paths[i] = 1
+        else:
+            links = le.door_links(prev_row, row)
+            offsets = prev_row.door_offsets
+            counts = [0] * len(row)
+            for i, n in enumerate(paths):
+                if n:
+                    for t in links[offsets[i]:offsets[i + 1]]:
+                        counts[t] += n
+            paths = counts
+            if not any(paths):
+                return
+        yield p, row, paths
+        prev_row = row
+
+
+def layered_explore(start_p: int, start_h, max_prime: int):
+    """
+    Same summary as depth_first_explore(start_p, start_h, max_prime=...)
+    without walking the paths: the labyrinth is a layered DAG, so the
+    DFS frames are exactly the paths from the start room, and each
+    count is a sum over rooms of (paths into the room) x (its share).
+      total_nodes_visited = paths into every room up to max_prime
+      total_steps         = paths x doors (doors beyond max_prime included,
+                            as the DFS counts them before refusing them)
+      max_depth           = rooms on the longest path
+    Cost is one pass over each row's doors. There is no step cap, so the
+    status is "completed" or "start_invalid"; for the same reason a
+    ceiling is required (max_prime=None, which the DFS leaves to its
+    step cap, raises ValueError).
+    """
+    if max_prime is None:
+        raise ValueError("layered_explore needs a max_prime ceiling")
+    total_nodes = 0
+    total_steps = 0
+    max_depth = 0
+    # the DFS always pushes the start room, even above the ceiling
+    ceiling = max(max_prime, int(start_p))
+    for depth, (p, row, paths) in enumerate(
+        iter_path_counts(start_p, start_h, ceiling), start=1
+    ):
+        total_nodes += sum(paths)
+        offsets = row.door_offsets
+        total_steps += sum(
+            n * (offsets[i + 1] - offsets[i]) for i, n in enumerate(paths) if n
+        )
+        max_depth = depth
+
+    return {
+        "status": "completed" if max_depth else "start_invalid",
+        "total_steps": total_steps,
+        "total_nodes_visited": total_nodes,
+        "max_depth": max_depth,
+    }
+
+
+# ---------- EXACT WALK PROBABILITIES ----------
+
+def iter_visit_probabilities(start_p: int, start_h, max_prime: int,
+                             exact: bool = False):
+    """
+    Probability that random_walk from (start_p, start_h) visits each
+    room, one prime at a time: yields (p, row, probs) for
+    start_p <= p <= max_prime, probs[i] for row.room(i). Every room
+    passes its probability on to its doors in equal shares. Floats by
+    default, fractions.Fraction with exact=True. Stops once no
+    probability is left; yields nothing if the start room is not valid.
+    """
+    zero = Fraction(0) if exact else 0.0
+    prev_row, probs = None, None
+    for p, row, nxt in le.iter_rows(int(start_p), max_prime):
+        if prev_row is None:
+            i = row.index_of(tuple(start_h))
+            if i is None:
+                return
+            probs = [zero] * len(row)
+            probs[i] = zero + 1
+        else:
+            links = le.door_links(prev_row, row)
+            offsets = prev_row.door_offsets
+            flow = [zero] * len(row)
+            for i, q in enumerate(probs):
+                lo, hi = offsets[i], offsets[i + 1]
+                if q and hi > lo:
+                    share = q / (hi - lo)
+                    for t in links[lo:hi]:
+                        flow[t] += share
+            probs = flow
+            if not any(probs):
+                return
+        yield p, row, probs
+        prev_row = row
+
+
+def walk_probabilities(start_p: int, start_h, max_prime: int,
+                       exact: bool = False):
+    """
+    Exact outcome distribution of random_walk from (start_p, start_h)
+    up to the top prime (the largest prime <= max_prime), ignoring
+    max_steps. One pass over the rows replaces sampling.
+
+    Returns a summary dict:
+      {
+        "status": "completed" | "start_invalid",
+        "visit": {p: {h: probability}},   # rooms with probability > 0
+        "dead_end": {p: probability},     # walk ends at p with no doors
+        "survived": probability,          # walk reaches the top prime
+      }
+    """
+    visit = {}
+    dead_end = {}
+    survived = Fraction(0) if exact else 0.0
+    last = None
+    for p, row, probs in iter_visit_probabilities(start_p, start_h, max_prime, exact):
+        visit[p] = {row.room(i): q for i, q in enumerate(probs) if q}
+        offsets = row.door_offsets
+        dead_end[p] = sum(
+            (q for i, q in enumerate(probs) if q and offsets[i] == offsets[i + 1]),
+            Fraction(0) if exact else 0.0,
+        )
+        last = p, probs
+
+    if last is None:
+        return {"status": "start_invalid", "visit": {}, "dead_end": {}, "survived": survived}
+
+    p, probs = last
+    if not le.primes_between(p + 1, max_prime):
+        # the walk made it to the top row: nothing there is a dead end yet
+        del dead_end[p]
+        survived = sum(probs)
+    dead_end = {q: mass for q, mass in dead_end.items() if mass}
+    return {"status": "completed", "visit": visit, "dead_end": dead_end, "survived": survived}
+
+
+# ---------- BATCH MONTE CARLO ----------
+
+WALK_CHUNK = 10_000   # walks per seeded stream
+
+
+def _walk_chunk(job):
+    """
+    Run one seeded stream of random walks (worker side). Walks follow
+    door positions through le.door_links instead of materialising rooms,
+    but draw exactly like random_walk, so stream k equals random_walk
+    called with random.Random(f"{seed}:{k}").
+    Returns (length, status, terminal prime) Counters.
+    """
+    start_p, start_h, n_walks, seed, stream, max_steps = job
+    rng = random.Random(f"{seed}:{stream}")
+    lengths, statuses, terminals = Counter(), Counter(), Counter()
+
+    layers = {}   # p -> (door_offsets, links, nxt)
+
+    def layer(p):
+        entry = layers.get(p)
+        if entry is None:
+            row, nxt = le.build_row(p)
+            links = None if nxt is None else le.door_links(row, le.build_row(nxt)[0])
+            entry = layers[p] = (row.door_offsets, links, nxt)
+        return entry
+
+    row, _ = le.build_row(start_p)
+    i0 = row.index_of(tuple(start_h))
+    for _ in range(n_walks):
+        p, i, length = start_p, i0, 1
+        while True:
+            if length > max_steps:
+                status = "max_steps"
+                break
+            if i is None:
+                status = "h_not_found"
+                break
+            offsets, links, nxt = layer(p)
+            if nxt is None:
+                status = "no_next_prime"
+                break
+            lo, hi = offsets[i], offsets[i + 1]
+            if lo == hi:
+                status = "dead_end"
+                break
+            i = links[lo + rng.randrange(hi - lo)]
+            p = nxt
+            length += 1
+        lengths[length] += 1
+        statuses[status] += 1
+        terminals[p] += 1
+    return lengths, statuses, terminals
+
+
+def random_walk_batch(n_walks: int,
+                      start_p: int = DEFAULT_START_P,
+                      start_h=DEFAULT_START_H,
+                      seed=0,
+                      max_steps: int = 1000,
+                      workers: int | None = None):
+    """
+    n_walks independent random walks, spread over a process pool
+    (workers == 1 runs them here; None uses every core).
+    Walks are split into streams of WALK_CHUNK, stream k seeded with
+    f"{seed}:{k}", so the result depends only on seed and n_walks (not
+    on the worker count). Paths are not kept.
+
+    Returns a summary dict:
+      {
+        "walks": int,
+        "length": Counter,          # rooms per path -> walks
+        "status": Counter,          # random_walk status -> walks
+        "terminal_prime": Counter,  # prime of the last room -> walks
+      }
+    """
+    jobs = [
+        (int(start_p), tuple(start_h), min(WALK_CHUNK, n_walks - lo), seed, k, max_steps)
+        for k, lo in enumerate(range(0, n_walks, WALK_CHUNK))
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    summary = {
+        "walks": n_walks,
+        "length": Counter(),
+        "status": Counter(),
+        "terminal_prime": Counter(),
+    }
+    if workers == 1 or len(jobs) <= 1:
+        return _merge_walks(summary, map(_walk_chunk, jobs))
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return _merge_walks(summary, pool.map(_walk_chunk, jobs))
+
+
+def _merge_walks(summary, results):
+    for lengths, statuses, terminals in results:
+        summary["length"].update(lengths)
+        summary["status"].update(statuses)
+        summary["terminal_prime"].update(terminals)
+    return summary
+
+
+# ---------- LOCK-STEP WALKS (NUMPY) ----------
+
+LOCKSTEP_COHORT = 1 << 16   # walks advanced together
+
+
+def lockstep_walks(n_walks: int,
+                   start_p: int = DEFAULT_START_P,
+                   start_h=DEFAULT_START_H,
+                   seed=0,
+                   max_steps: int = 1000,
+                   cohort: int = LOCKSTEP_COHORT):
+    """
+    Same summary as random_walk_batch, from a single process with NumPy.
+    Walks start together and move one prime per step, so a whole cohort
+    is always on the same row: each step picks every walk's door with
+    one vectorized draw into that row's door arrays and drops the walks
+    that ended. Reproducible for a given seed and cohort size (the draws
+    differ from random_walk's). Requires NumPy.
+    """
+    if np is None:
+        raise ImportError("lockstep_walks needs NumPy (pip install numpy)")
+
+    rng = np.random.default_rng(seed)
+    summary = {
+        "walks": n_walks,
+        "length": Counter(),
+        "status": Counter(),
+        "terminal_prime": Counter(),
+    }
+
+    def finish(count, length, status, p):
+        summary["length"][length] += count
+        summary["status"][status] += count
+        summary["terminal_prime"][p] += count
+
+    start_p = int(start_p)
+    row, _ = le.build_row(start_p)
+    i0 = row.index_of(tuple(start_h))
+    if i0 is None:
+        if n_walks:
+            finish(n_walks, 1, "h_not_found", start_p)
+        return summary
+
+    layers = {}   # p -> (door offsets, links, nxt) as NumPy arrays
+
+    def layer(p):
+        entry = layers.get(p)
+        if entry is None:
+            row, nxt = le.build_row(p)
+            offsets = np.frombuffer(row.door_offsets, dtype=np.uintc).astype(np.intp)
+            links = None
+            if nxt is not None:
+                links = le.door_links(row, le.build_row(nxt)[0])
+                links = np.frombuffer(links, dtype=np.uintc).astype(np.intp)
+            entry = layers[p] = (offsets, links, nxt)
+        return entry
+
+    for lo in range(0, n_walks, cohort):
+        pos = np.full(min(cohort, n_walks - lo), i0, dtype=np.intp)
+        p, length = start_p, 1
+        while pos.size:
+            if length > max_steps:
+                finish(pos.size, length, "max_steps", p)
+                break
+            offsets, links, nxt = layer(p)
+            if nxt is None:
+                finish(pos.size, length, "no_next_prime", p)
+                break
+            first = offsets[pos]
+            deg = offsets[pos + 1] - first
+            alive = deg > 0
+            ended = pos.size - int(np.count_nonzero(alive))
+            if ended:
+                finish(ended, length, "dead_end", p)
+            pos = links[first[alive] + rng.integers(deg[alive])]
+            p = nxt
+            length += 1
+    return summary
+
+
 # ---------- DEMO WHEN RUN DIRECTLY ----------
 
 if __name__ == "__main__":
@@ -272,6 +835,10 @@ if __name__ == "__main__":
         end_p, end_h = path[-1]
         print(f"Walk {i+1}: length={len(path)}, status={status}, end=(p={end_p}, h={end_h})")
 
+    batch = random_walk_batch(10_000, seed=1)
+    print(f"\n{batch['walks']} walks in a batch: statuses {dict(batch['status'])}, "
+          f"longest {max(batch['length'])} rooms")
+
     # For visible backtracking, keep the ceiling SMALL first.
     limit_prime = 29  # you can bump this later
     print(f"\nDepth-first exploration with backtracking from default root "
@@ -296,4 +863,14 @@ if __name__ == "__main__":
         f"Total steps: {summary['total_steps']}, "
         f"nodes visited: {summary['total_nodes_visited']}, "
         f"max depth: {summary['max_depth']}"
+    )
+
+    # The same numbers by path counting scale to much higher ceilings.
+    limit_prime = 1000
+    summary = layered_explore(DEFAULT_START_P, DEFAULT_START_H, limit_prime)
+    print(
+        f"\nCounted without walking (max_prime = {limit_prime}): "
+        f"total steps: {summary['total_steps']}, "
+        f"nodes visited: {summary['total_nodes_visited']}, "
+        f"max depth: {summary['max_depth']}"
     ) 
@@ -0,0 +1,223 @@
+# -----------------------------------------
+#  labyrinth_store.py
+#  Memory-mapped, read-only row store for Prime Labyrinth
+#  Precompute a prime range once, then share it between processes
+# -----------------------------------------
+
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+
+import labyrinth_engine as le
+
+
+# ---------- FILE FORMAT ----------
+#
+# Little-endian, fixed-width columns, one after another:
+#
+#   header        MAGIC, VERSION, 0, 0, n_primes, n_rooms, n_doors
+#   room_base     u64 * (n_primes + 1)   first room of each prime
+#   door_base     u64 * (n_primes + 1)   first door of each prime
+#   primes        u32 * n_primes
+#   nxt           u32 * n_primes
+#   a, b, c       u32 * n_rooms each
+#   door_end      u32 * n_rooms          CSR end of each room's doors,
+#                                        relative to its prime's door_base
+#   door_targets  u32 * (3 * n_doors)    flattened (aa, bb, cc)
+
+MAGIC = b"PLRS"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQQQ")
+
+# array and memoryview use native byte order; big-endian hosts swap
+_SWAP = sys.byteorder != "little"
+
+
+def _column_file():
+    return tempfile.TemporaryFile()
+
+
+def _write_column(col: array, f):
+    if _SWAP:
+        col = array(col.typecode, col)
+        col.byteswap()
+    col.tofile(f)
+
+
+def write_store(path: str, start: int, end: int, workers: int | None = 1):
+    """
+    Compute every row for primes start <= p <= end and write them to path.
+    Rows are streamed into per-column spool files, so memory stays at a
+    few rows (a few SHARD_COST shards with workers) regardless of the
+    range size.
+    Returns (n_primes, n_rooms, n_doors).
+    """
+    primes = le.primes_between(start, end)
+    if workers == 1:
+        rows = le.iter_rows_for(primes)
+    else:
+        rows = le.iter_rows_parallel_for(primes, workers)
+
+    names = ("primes", "nxt", "a", "b", "c", "door_end", "door_targets")
+    cols = {name: _column_file() for name in names}
+    room_base = array("Q", [0])
+    door_base = array("Q", [0])
+    try:
+        for p, row, nxt in rows:
+            _write_column(array("I", [p]), cols["primes"])
+            _write_column(array("I", [nxt]), cols["nxt"])
+            _write_column(row.a, cols["a"])
+            _write_column(row.b, cols["b"])
+            _write_column(row.c, cols["c"])
+            _write_column(row.door_offsets[1:], cols["door_end"])
+            _write_column(row.door_targets, cols["door_targets"])
+            room_base.append(room_base[-1] + len(row))
+            door_base.append(door_base[-1] + len(row.door_targets) // 3)
+
+        with open(path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, 0, 0,
+                                  len(primes), room_base[-1], door_base[-1]))
+            _write_column(room_base, out)
+            _write_column(door_base, out)
+            for name in names:
+                cols[name].seek(0)
+                shutil.copyfileobj(cols[name], out)
+    finally:
+        for f in cols.values():
+            f.close()
+
+    return len(primes), room_base[-1], door_base[-1]
+
+
+# ---------- READER ----------
+
+class RowStore:
+    """
+    Read-only view of a store file through mmap.
+    Pages are shared between every process that opens the same file.
+    (On big-endian hosts the columns are byteswapped into private
+    arrays instead.)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._map)
+
+        magic, version, _, _, n_primes, n_rooms, n_doors = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a Prime Labyrinth row store")
+
+        pos = HEADER.size
+
+        def take(code: str, count: int):
+            nonlocal pos
+            size = count * struct.calcsize(code)
+            col = view[pos:pos + size].cast(code)
+            pos += size
+            if _SWAP:
+                col = array(code, col.tobytes())
+                col.byteswap()
+            return col
+
+        self.room_base = take("Q", n_primes + 1)
+        self.door_base = take("Q", n_primes + 1)
+        self.primes = take("I", n_primes)
+        self.nxt = take("I", n_primes)
+        self.a = take("I", n_rooms)
+        self.b = take("I", n_rooms)
+        self.c = take("I", n_rooms)
+        self.door_end = take("I", n_rooms)
+        self.door_targets = take("I", 3 * n_doors)
+
+    def __len__(self):
+        return len(self.primes)
+
+    def _prime_pos(self, p: int):
+        i = bisect_left(self.primes, p)
+        if i < len(self.primes) and self.primes[i] == p:
+            return i
+        return None
+
+    def covers(self, p: int) -> bool:
+        return self._prime_pos(p) is not None
+
+    def row(self, p: int):
+        """Returns: (row, nxt) like le.build_row, or (None, None) if p is not stored."""
+        i = self._prime_pos(p)
+        if i is None:
+            return None, None
+        lo, hi = self.room_base[i], self.room_base[i + 1]
+        d_lo, d_hi = self.door_base[i], self.door_base[i + 1]
+
+        row = le.Row(p, self.nxt[i])
+        row.a = array("I", self.a[lo:hi].tobytes())
+        row.b = array("I", self.b[lo:hi].tobytes())
+        row.c = array("I", self.c[lo:hi].tobytes())
+        row.door_offsets = array("I", [0])
+        row.door_offsets.frombytes(self.door_end[lo:hi].tobytes())
+        row.door_targets = array("I", self.door_targets[3 * d_lo:3 * d_hi].tobytes())
+        return row, row.nxt
+
+    def doors_for(self, p: int, h):
+        """
+        Returns: (doors, nxt) like le.doors_for, reading only the one room.
+        doors is None if h is not a room of p; (None, None) if p is not stored.
+        """
+        i = self._prime_pos(p)
+        if i is None:
+            return None, None
+        nxt = self.nxt[i]
+        if len(h) != 3:
+            return None, nxt
+        a, b, c = h
+        lo, hi = self.room_base[i], self.room_base[i + 1]
+        lo = bisect_left(self.a, a, lo, hi)
+        hi = bisect_right(self.a, a, lo, hi)
+        k = bisect_left(self.b, b, lo, hi)
+        if k >= hi or self.b[k] != b or self.c[k] != c:
+            return None, nxt
+
+        row_lo = self.room_base[i]
+        start = self.door_end[k - 1] if k > row_lo else 0
+        base = 3 * (self.door_base[i] + start)
+        end = 3 * (self.door_base[i] + self.door_end[k])
+        t = self.door_targets
+        return [(t[j], t[j + 1], t[j + 2]) for j in range(base, end, 3)], nxt
+
+    def close(self):
+        le.detach_store(self)
+        # drop the exported views before closing the map
+        for name in ("room_base", "door_base", "primes", "nxt",
+                     "a", "b", "c", "door_end", "door_targets"):
+            col = getattr(self, name)
+            if isinstance(col, memoryview):
+                col.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def open_store(path: str, attach: bool = True) -> RowStore:
+    """Open a store file and (by default) let the engine serve rows from it."""
+    store = RowStore(path)
+    if attach:
+        le.attach_store(store)
+    return store
+
+
+# ---------- CLI ----------
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python labyrinth_store.py START END FILE")
+        raise SystemExit(2)
+
+    start, end, path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    n_primes, n_rooms, n_doors = write_store(path, start, end, workers=None)
+    print(f"Wrote {path}: {n_primes} primes, {n_rooms} rooms, {n_doors} doors.")
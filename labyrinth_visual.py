@@ -9,8 +9,8 @@ import labyrinth_search as ls
 
 # ---------- GLOBAL STATE ----------
 
-# per-room state: (p, h) -> {"doors": [...], "opened": [...], "nxt": int|None}
-room_state: dict[tuple[int, tuple[int, int, int]], dict] = {}
+# per-room state: le.room_key(p, h) (room id, or (p, h) past the table) -> {"doors": [...], "opened": [...], "nxt": int|None}
+room_state: dict[le.RoomKey, dict] = {}
 
 # stack for reverse
 path_stack: list[dict] = []
@@ -23,16 +23,11 @@ def reset_state():
 
 
 def get_or_create_room(p: int, h: tuple[int, int, int]):
-    key = (p, h)
+    key = le.room_key(p, h)
     if key in room_state:
         return room_state[key]
 
-    row, nxt = le.build_row(p)
-    doors = None
-    for rh, ds in row:
-        if rh == h:
-            doors = ds
-            break
+    doors, nxt = le.doors_for(p, h)
 
     if doors is None:
         doors = []